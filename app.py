@@ -7,38 +7,98 @@ Functions:
         another group chat, another bot would have to be created with its own
         endpoint function and its own Twilio number)
 """
-import html
+import threading
+import time
+from collections import OrderedDict
 from typing import List, Tuple
 
 from flask import Flask, Request, request
+from markupsafe import escape
 
-from chatbot import mr_botty
+from chatbot import get_bot
 
 app = Flask(__name__)
 """The server running the chatbot."""
 
+_DEDUP_TTL = 600  # seconds to remember a message so retries can be ignored
+_DEDUP_SIZE = 10000  # max number of messages to remember
 
-def _get_incoming_msg(req: Request) -> Tuple[str, str, List[str]]:
+_responses: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+"""Time received and response for recent messages, keyed by message SID."""
+_responses_lock = threading.Lock()
+
+
+def _get_incoming_msg(req: Request) -> Tuple[str, str, List[str], str]:
     """Get an incoming message sent to the bot and its sender.
 
     Arguments:
         req -- Flask Request object
 
     Returns:
-        The message contents, sender contact info, sender name, and media URLs
-            from a POST request to the bot.
+        The message contents, sender contact info, media URLs, and Twilio
+            message SID from a POST request to the bot.
     """
-    msg: str = html.escape(req.values.get(
+    values = req.values  # merged form and query args, built once per request
+    # str() so later concatenation doesn't escape other strings as Markup
+    msg: str = str(escape(values.get(
         "Body",
         default="Hello, world",
-        type=str).strip())  # type: ignore [union-attr]
-    sender_contact: str = html.escape(req.values.get(
-        "From", type=str))  # type: ignore [union-attr,assignment,type-var]
-    # Unable to html.escape() this without clobbering URL, but it's generated by
-    # the WhatsApp CDN anyways, so it's safe
-    media_urls = [req.values[k]
-                  for k in req.values.keys() if k.startswith("MediaUrl")]
-    return (msg, sender_contact, media_urls)
+        type=str).strip()))  # type: ignore [union-attr]
+    # No need to escape this; it's a WhatsApp number generated by Twilio and
+    # is only used to look up the subscriber
+    sender_contact: str = values.get(
+        "From", default="", type=str)  # type: ignore [assignment]
+    # Unable to escape() these without clobbering URL, but they're generated by
+    # the WhatsApp CDN anyways, so they're safe. Twilio numbers the media URLs
+    # and tells us how many there are, so there's no need to scan every key in
+    # the request. Skip any that are missing rather than failing the request,
+    # which Twilio would only retry.
+    num_media: int = values.get(
+        "NumMedia", default=0, type=int)  # type: ignore [assignment]
+    media_urls: List[str] = [
+        url for url in (values.get(f"MediaUrl{i}") for i in range(num_media))
+        if url is not None]
+    message_sid: str = values.get(
+        "MessageSid", default="", type=str)  # type: ignore [assignment]
+    return (msg, sender_contact, media_urls, message_sid)
+
+
+def _claim_msg(message_sid: str) -> str | None:
+    """Check whether a message has been received before, and remember it if not.
+
+    Twilio retries webhooks that fail or time out, so the same message may
+    arrive more than once. Processing it again would push it to the group again.
+
+    Arguments:
+        message_sid -- Twilio's unique ID for the message
+
+    Returns:
+        None if the message is new, or else the response to give to the repeat
+            (an empty string if the original is still being processed).
+    """
+    now = time.monotonic()
+    with _responses_lock:
+        # Forget old messages; they're ordered by when they were received
+        while _responses and (
+                len(_responses) >= _DEDUP_SIZE or
+                next(iter(_responses.values()))[0] < now - _DEDUP_TTL):
+            _responses.popitem(last=False)
+        if message_sid in _responses:
+            return _responses[message_sid][1]
+        _responses[message_sid] = (now, "")
+        return None
+
+
+def _remember_response(message_sid: str, response: str) -> None:
+    """Save the response to a claimed message for any repeats of it.
+
+    Arguments:
+        message_sid -- Twilio's unique ID for the message
+        response -- The bot's response to the message
+    """
+    with _responses_lock:
+        if message_sid in _responses:  # hasn't expired in the meantime
+            _responses[message_sid] = (_responses[message_sid][0], response)
 
 
 # Theoretically we could support multiple bots on one server, but they'd
@@ -50,11 +110,23 @@ def bot() -> str:
     Returns:
         The bot's response.
     """
-    (msg, sender_contact, media_urls) = _get_incoming_msg(request)
-    return mr_botty.process_msg(
-        msg,
-        sender_contact,
-        media_urls)
+    (msg, sender_contact, media_urls, message_sid) = _get_incoming_msg(request)
+    if message_sid == "":  # can't tell if it's a repeat
+        return get_bot().process_msg(msg, sender_contact, media_urls)
+    cached = _claim_msg(message_sid)
+    if cached is not None:  # already received
+        return cached
+    try:
+        response = get_bot().process_msg(
+            msg,
+            sender_contact,
+            media_urls)
+    except BaseException:
+        with _responses_lock:  # let Twilio's retry try again
+            _responses.pop(message_sid, None)
+        raise
+    _remember_response(message_sid, response)
+    return response
 
 
 if __name__ == "__main__":
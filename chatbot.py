@@ -3,28 +3,40 @@
 """Basic functionality for a WhatsApp chatbot.
 
 This module contains the class definition to create Chatbot objects, each of
-which can support one group of subscribers on WhatsApp. It also contains an
-instance of such a chatbot for import by the Flask app.
+which can support one group of subscribers on WhatsApp. It also provides such a
+chatbot for the Flask app, created the first time it's needed.
 
 Classes:
     SubscribersInfo -- A TypedDict to describe a subscriber to the group chat
     Chatbot -- A class to keep track of data about a group chat and its
         associated WhatsApp bot
+
+Functions:
+    get_bot -- Get the chatbot used by the Flask app
+    shutdown_bot -- Push the messages the Flask app's chatbot is holding, if it
+        has been created
 """
 
-import json
+import atexit
+import functools
+import logging
 import os
 import re
-from datetime import datetime, timedelta
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, time, timedelta
 from types import SimpleNamespace
-from typing import Dict, List, TypedDict
+from typing import Any, Callable, Dict, List, Set, Tuple, TypedDict
+from xml.sax.saxutils import escape
 
+import orjson
 import requests
-from cryptography.fernet import Fernet
-from twilio.rest import Client
-from twilio.twiml.messaging_response import MessagingResponse
+from cryptography.fernet import Fernet, InvalidToken
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from language_data import LangData, translate_to
+from language_data import LangData, translate_to, translate_to_many
 
 consts = SimpleNamespace()
 
@@ -35,17 +47,148 @@ consts.REMOVE = "/remove"  # remove user
 consts.LIST = "/list"  # list all users
 consts.STATS = "/stats"  # get stats for user
 consts.LASTPOST = "/lastpost"  # get last post for user
+consts.TIME_FRAME = re.compile(r"(\d+)\s*(\w+)")  # /stats time frame
 
 # Roles for users in JSON file
 consts.USER = "user"  # can only execute test translation command
 consts.ADMIN = "admin"  # can execute all slash commands but cannot remove super
 consts.SUPER = "super"  # can execute all slash commands, no limits
-consts.VALID_ROLES = [consts.USER, consts.ADMIN, consts.SUPER]
+consts.VALID_ROLES = frozenset((consts.USER, consts.ADMIN, consts.SUPER))
 
 consts.API_OFFLINE = "LibreTranslate offline"  # LibreTranslate down error
 
+# TwiML surrounding the body of every reply
+consts.TWIML_PREFIX = \
+    '<?xml version="1.0" encoding="UTF-8"?><Response><Message><Body>'
+consts.TWIML_SUFFIX = "</Body></Message></Response>"
+
+consts.POOL_SIZE = 50  # max keep-alive connections to the Twilio API
+consts.RETRIES = 3  # retries for failed connections to the Twilio API
+consts.MAX_SENDS = 32  # max messages being sent to Twilio at once
+consts.PUSH_QUEUES = 8  # background queues for pushing group messages
+consts.BUFFER_WAIT = 1.5  # seconds to wait for more messages from a sender
+consts.BUFFER_MAX = 10  # max messages from one sender to combine into one
+consts.SAVE_WAIT = 0.25  # seconds to collect changes to data before saving
+consts.JOURNAL_WAIT = 1.0  # seconds to collect message timestamps to journal
+consts.JOURNAL_MAX = 32  # max message timestamps to hold before journaling
+consts.COMPACT_EVERY = 1000  # journaled messages before rewriting the logs file
+consts.GENERATION = "generation"  # logs file key for times it's been rewritten
+
 pm_char = "#"  # Example: #xX_bob_Xx Hey bob, this is a private message!
 
+logger = logging.getLogger(__name__)
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    """Replace the contents of a file without ever leaving it half-written.
+
+    Arguments:
+        path -- Path to the file to write
+        data -- New contents of the file
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)  # atomic, so readers see old or new data
+
+
+def _write_encrypted(
+        path: str,
+        backup_path: str,
+        fernet: Fernet,
+        data: Any) -> None:
+    """Save data to an encrypted JSON file and its backup.
+
+    Arguments:
+        path -- Path to the encrypted JSON file
+        backup_path -- Path to the backup of the encrypted JSON file
+        fernet -- Fernet instance holding the encryption key for both files
+        data -- Data to serialize as JSON
+    """
+    # No need to indent since the file is only ever read once it's decrypted
+    encrypted_data = fernet.encrypt(orjson.dumps(data))
+    _write_atomically(path, encrypted_data)
+    # Write the same bytes to the backup file instead of reading them back
+    _write_atomically(backup_path, encrypted_data)
+
+
+def _read_encrypted(path: str, backup_path: str, fernet: Fernet) -> Any:
+    """Read and decrypt a JSON file, falling back to its backup if corrupted.
+
+    Arguments:
+        path -- Path to the encrypted JSON file
+        backup_path -- Path to the backup of the encrypted JSON file
+        fernet -- Fernet instance holding the encryption key for both files
+
+    Returns:
+        The parsed contents of the file (or of its backup).
+    """
+    with open(path, "rb") as file:
+        encrypted_data = file.read()
+    try:
+        return orjson.loads(fernet.decrypt(encrypted_data))
+    except BaseException:  # pylint: disable=broad-exception-caught
+        # Handle corrupted file
+        # Print message to server logs file that original file is
+        # corrupted...recent data may not have been saved.
+        with open("server_log.txt", "a", encoding="utf-8") as file:
+            timestamp = datetime.now().strftime("%Y-%m-%d")
+            file.write(
+                timestamp +
+                f": Corrupted {os.path.basename(path)} file...using backup file. Newest data may be missing.\n")
+    with open(backup_path, "rb") as file:
+        backup_encrypted_data = file.read()
+    return orjson.loads(fernet.decrypt(backup_encrypted_data))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_client(account_sid: str, auth_token: str) -> Any:
+    """Get the Twilio client for an account, creating it on first use.
+
+    Bots on the same account share a client, and with it a pool of keep-alive
+    connections to Twilio, rather than each paying for new TLS handshakes.
+
+    Arguments:
+        account_sid -- Account SID
+        auth_token -- Account auth token
+
+    Returns:
+        A twilio.rest.Client for the account.
+    """
+    # The Twilio client is slow to import and only needed here, so don't make
+    # every importer of this module pay for it
+    # pylint: disable-next=import-outside-toplevel
+    from twilio.http.http_client import TwilioHttpClient
+
+    # pylint: disable-next=import-outside-toplevel
+    from twilio.rest import Client
+
+    http_client = TwilioHttpClient(pool_connections=True)
+    http_client.session.mount(  # type: ignore [union-attr]
+        "https://",
+        HTTPAdapter(
+            pool_maxsize=consts.POOL_SIZE,
+            max_retries=Retry(total=consts.RETRIES, backoff_factor=0.1)))
+    return Client(account_sid, auth_token, http_client=http_client)
+
+
+def _first_day(start: datetime) -> str:
+    """Get the first day whose midnight is no earlier than a given time.
+
+    Logs are kept by day as YYYY-MM-DD strings, which sort the same as the
+    dates they stand for, so they can be compared to the result as strings.
+
+    Arguments:
+        start -- The earliest time to include
+
+    Returns:
+        The date of the first day to include, formatted as YYYY-MM-DD.
+    """
+    first_day = start.date()
+    if datetime.combine(first_day, time()) < start:
+        first_day += timedelta(days=1)
+    return first_day.isoformat()
+
 
 class SubscribersInfo(TypedDict):
     """A TypedDict to describe a subscriber.
@@ -63,13 +206,16 @@ class Chatbot:
     """The chatbot logic.
 
     Class variables:
-        commands -- List of slash commands for the bot
+        commands -- Set of slash commands for the bot
         languages -- Data shared by all chatbots on the server about the
             languages supported by LibreTranslate
 
     Instance variables:
         client -- Client with which to access the Twilio API
         number -- Phone number the bot texts from
+        whatsapp_number -- WhatsApp contact info the bot texts from
+        messaging_service_sid -- SID of the Twilio Messaging Service the bot
+            sends from, if any
         json_file -- Path to a JSON file containing subscriber data
         backup_file -- Path to a JSON file containing backup data for the
             subscribers JSON file
@@ -79,23 +225,62 @@ class Chatbot:
             logs JSON file
         logs_key_file -- Path to a file containing the encryption key for the
             logs JSON file
+        logs_journal_file -- Path to a file of encrypted message timestamps
+            recorded since the logs JSON file was last written
+        fernet -- Fernet instance for the subscriber data's encryption key
+        logs_fernet -- Fernet instance for the logs data's encryption key
+        logs_generation -- Number of times the logs JSON file has been
+            rewritten, which tags each entry in the logs journal file so that
+            entries already in the logs JSON file aren't counted again
         subscribers -- Dictionary containing the data loaded from the file
         display_names -- Dictionary mapping display names to WhatsApp numbers
             for subscribers
+        lang_groups -- Dictionary mapping language codes to sets of the WhatsApp
+            contact info of subscribers who prefer them, kept in step with
+            subscribers
         twilio_account_sid -- Account SID for the Twilio account
         twilio_auth_token -- Twilio authorization token
         twilio_number -- Bot's registered Twilio number
+        lock -- Lock guarding subscriber and logs data, which is shared by the
+            server's request threads
+        admin_commands -- Dictionary mapping each slash command to the method
+            that performs it for an admin or superuser
+        send_pool -- Thread pool for translating and sending group messages to
+            all recipients concurrently
+        push_queues -- Single-threaded executors that push group messages in
+            the background, each serving a fixed subset of senders so their
+            messages stay in order; they're emptied before the process exits
+        buffers -- Dictionary mapping senders to the display name, group
+            messages, and flush timer of messages they've sent in the last few
+            moments, which will be pushed together
+        buffer_lock -- Lock guarding the buffers dictionary
+        subscribers_dirty -- Whether subscribers has changes not yet saved
+        logs_dirty -- Whether logs has changes not yet saved
+        journaled -- Number of message timestamps in the logs journal file
+        journal_pending -- Message timestamps counted in logs but not yet
+            written to the logs journal file, as (contact, date) pairs
+        journal_timer -- Timer that will write pending message timestamps to
+            the logs journal file, if one is pending
+        last_post -- Dictionary mapping the WhatsApp contact info of each
+            subscriber with messages in logs to the date of their latest one
+        pruned_on -- Date logs was last pruned of year-old timestamps,
+            formatted as YYYY-MM-DD
+        save_timer -- Timer that will save changed data, if one is pending
+        shut_down -- Whether queued and held group messages have been pushed
+            for shutdown
 
     Methods:
         process_msg -- Process a message to the bot
+        shutdown -- Push queued and held group messages before the process
+            exits
     """
-    commands = [
+    commands = frozenset({
         consts.TEST,
         consts.ADD,
         consts.REMOVE,
         consts.LIST,
         consts.STATS,
-        consts.LASTPOST]
+        consts.LASTPOST})
     """All slash commands for the bot."""
 
     languages: LangData | None = None
@@ -111,7 +296,9 @@ class Chatbot:
             key_file: str = "subscribers_key.key",
             logs_file: str = "logs.json",
             backup_logs_file: str = "logs_bak.json",
-            logs_key_file: str = "logs_key.key"):
+            logs_key_file: str = "logs_key.key",
+            logs_journal_file: str = "logs_journal.txt",
+            messaging_service_sid: str | None = None):
         """Create the ChatBot object and populate class members as needed.
 
         Arguments:
@@ -133,73 +320,204 @@ class Chatbot:
                 the above JSON file (default: {"logs_bak.json"})
             logs_key_file -- Path to a file containing the encryption key for
                 the logs JSON file (default: {"logs_key.json"})
+            logs_journal_file -- Path to a file of encrypted message timestamps
+                not yet written to the logs JSON file, created if needed
+                (default: {"logs_journal.txt"})
+            messaging_service_sid -- SID of a Twilio Messaging Service to send
+                from instead of sending directly from the bot's number
+                (default: {None})
         """
         if Chatbot.languages is None:
             Chatbot.languages = LangData()
-        self.client = Client(account_sid, auth_token)
+        self.client = _get_client(account_sid, auth_token)
         self.number = number
+        self.whatsapp_number = f"whatsapp:{number}"
+        self.messaging_service_sid = messaging_service_sid
         self.json_file = f"json/{json_file}"
         self.backup_file = f"json/{backup_file}"
         self.key_file = f"json/{key_file}"
         self.logs_file = f"json/{logs_file}"
         self.backup_logs_file = f"json/{backup_logs_file}"
         self.logs_key_file = f"json/{logs_key_file}"
+        self.logs_journal_file = f"json/{logs_journal_file}"
         self.twilio_account_sid = account_sid
         self.twilio_auth_token = auth_token
         self.twilio_number = number
+        self.lock = threading.RLock()
+        # Every handler takes the message split into words and the sender's
+        # contact info
+        self.admin_commands: Dict[str, Callable[[List[str], str], str]] = {
+            consts.TEST: self._test_translate,  # test translate
+            consts.ADD: self._add_subscriber,  # add user to subscribers
+            consts.REMOVE: self._remove_subscriber,  # remove user
+            # list all subscribers with their data
+            consts.LIST: lambda _, sender: self._list_subscribers(sender),
+            consts.STATS: lambda parts, sender: self._generate_stats(
+                sender, parts),
+            consts.LASTPOST: self._last_post_cmd}  # get last post time
+        self.send_pool = ThreadPoolExecutor(max_workers=consts.MAX_SENDS)
+        self.push_queues = [ThreadPoolExecutor(max_workers=1)
+                            for _ in range(consts.PUSH_QUEUES)]
+        self.buffers: Dict[str, Tuple[str, List[str], threading.Timer]] = {}
+        self.buffer_lock = threading.Lock()
+        self.subscribers_dirty = False
+        self.logs_dirty = False
+        self.journaled = 0
+        self.journal_pending: List[Tuple[str, str]] = []
+        self.journal_timer: threading.Timer | None = None
+        self.pruned_on = ""
+        self.save_timer: threading.Timer | None = None
+        atexit.register(self._save)  # don't lose changes on shutdown
+        atexit.register(self._flush_journal)
+        # Thread pools refuse new work once the interpreter starts exiting, so
+        # push pending messages before then; hooks registered later run first,
+        # and concurrent.futures registered its own when it was imported
+        self.shut_down = False
+        threading._register_atexit(  # pylint: disable=protected-access
+            self.shutdown)
 
-        with open(self.json_file, "rb") as file:
-            encrypted_data = file.read()
         with open(self.key_file, "rb") as file:
             self.key = file.read()  # Retrieve encryption key
-        f = Fernet(self.key)
-        try:
-            unencrypted_data = f.decrypt(encrypted_data).decode("utf-8")
-            self.subscribers: Dict[str, SubscribersInfo] = json.loads(
-                unencrypted_data)
-        except BaseException:  # pylint: disable=broad-exception-caught
-            # Handle corrupted file
-            # Print message to server logs file that original file is
-            # corrupted...recent data may not have been saved.
-            with open("server_log.txt", "a", encoding="utf-8") as file:
-                timestamp = datetime.now().strftime("%Y-%m-%d")
-                file.write(
-                    timestamp +
-                    ": Corrupted subscribers.json file...using backup file. Newest data may be missing.\n")
-
-            with open(self.backup_file, "rb") as file:
-                backup_encrypted_data = file.read()
-            backup_unencrypted_data = f.decrypt(
-                backup_encrypted_data).decode("utf-8")
-            self.subscribers = json.loads(backup_unencrypted_data)
+        # Set up the cipher once rather than for every save
+        self.fernet = Fernet(self.key)
+        self.subscribers: Dict[str, SubscribersInfo] = _read_encrypted(
+            self.json_file, self.backup_file, self.fernet)
         self.display_names: Dict[str, str] = {
             v["name"]: k for k, v in self.subscribers.items()}
+        self.lang_groups: Dict[str, Set[str]] = {}
+        for contact, info in self.subscribers.items():
+            # Parsed strings aren't interned, so intern the few distinct
+            # languages and roles that get compared on every message
+            info["lang"] = sys.intern(info["lang"])
+            info["role"] = sys.intern(info["role"])
+            self.lang_groups.setdefault(info["lang"], set()).add(contact)
 
-        with open(self.logs_file, "rb") as file:
-            encrypted_logs_data = file.read()
         with open(self.logs_key_file, "rb") as file:
             self.key2 = file.read()  # Retrieve encryption key
-        f = Fernet(self.key2)
+        self.logs_fernet = Fernet(self.key2)
+        self.logs = _read_encrypted(
+            self.logs_file, self.backup_logs_file, self.logs_fernet)
+        self.logs_generation: int = self.logs.pop(consts.GENERATION, 0)
+        self._replay_journal()
+        # YYYY-MM-DD strings sort like dates, so the max is the latest
+        self.last_post: Dict[str, str] = {
+            contact: max(user_logs) for contact, user_logs in self.logs.items()
+            if len(user_logs) != 0}
+        if self.journaled > 0:  # fold it into the logs file
+            self.logs_dirty = True
+            self._save()
+
+    def _replay_journal(self) -> None:
+        """Count message timestamps journaled since logs was last written."""
         try:
-            unencrypted_logs_data = f.decrypt(
-                encrypted_logs_data).decode("utf-8")
-            # Put unecrypted data into dictionary
-            self.logs = json.loads(unencrypted_logs_data)
-        except BaseException:  # pylint: disable=broad-exception-caught
-            # Handle corrupted file
-            # Print message to server logs file that original file is
-            # corrupted...recent data may not have been saved.
-            with open("server_log.txt", "a", encoding="utf-8") as file:
-                timestamp = datetime.now().strftime("%Y-%m-%d")
-                file.write(
-                    timestamp +
-                    ": Corrupted logs.json file...using backup file. Latest logs may be missing.\n")
+            with open(self.logs_journal_file, "rb") as file:
+                tokens = file.read().split()
+        except FileNotFoundError:
+            return
+        for token in tokens:
+            try:
+                (generation, entries) = orjson.loads(
+                    self.logs_fernet.decrypt(token))
+            except (InvalidToken, orjson.JSONDecodeError):
+                continue  # left half-written by a crash
+            if generation < self.logs_generation:
+                # Written before the logs file was last rewritten, so it's
+                # already counted there; a crash kept the journal from being
+                # emptied
+                continue
+            for contact, timestamp in entries:
+                user_logs = self.logs.get(contact)
+                if user_logs is not None:  # hasn't been removed since
+                    user_logs[timestamp] = user_logs.get(timestamp, 0) + 1
+                self.journaled += 1
+
+    def _journal_timestamp(self, sender_contact: str, timestamp: str) -> None:
+        """Queue a message timestamp to be appended to the logs journal.
+
+        Appending a small entry is much cheaper than rewriting the whole logs
+        file, which is only rewritten once enough entries pile up. Timestamps
+        arriving close together are encrypted and appended as one entry. Call
+        with lock held.
 
-            with open(self.backup_logs_file, "rb") as file:
-                backup_encrypted_logs_data = file.read()
-            backup_unencrypted_logs_data = f.decrypt(
-                backup_encrypted_logs_data).decode("utf-8")
-            self.logs = json.loads(backup_unencrypted_logs_data)
+        Arguments:
+            sender_contact -- WhatsApp contact info of the sender
+            timestamp -- Date of the message, formatted as YYYY-MM-DD
+        """
+        self.journal_pending.append((sender_contact, timestamp))
+        if len(self.journal_pending) >= consts.JOURNAL_MAX:
+            self._flush_journal()
+        elif self.journal_timer is None:
+            self.journal_timer = threading.Timer(
+                consts.JOURNAL_WAIT, self._flush_journal)
+            self.journal_timer.start()
+
+    def _flush_journal(self) -> None:
+        """Append pending message timestamps to the logs journal."""
+        with self.lock:
+            if self.journal_timer is not None:
+                self.journal_timer.cancel()
+                self.journal_timer = None
+            if len(self.journal_pending) == 0:  # nothing new, or already saved
+                return
+            token = self.logs_fernet.encrypt(orjson.dumps(
+                [self.logs_generation, self.journal_pending]))
+            with open(self.logs_journal_file, "ab") as file:
+                file.write(token + b"\n")
+            self.journaled += len(self.journal_pending)
+            self.journal_pending = []
+            if self.journaled >= consts.COMPACT_EVERY:
+                self.logs_dirty = True
+                self._save_soon()
+
+    def _prune_logs(self) -> None:
+        """Remove message timestamps older than a year. Call with lock held."""
+        now = datetime.now()
+        today = now.date().isoformat()
+        if self.pruned_on == today:  # nothing new has aged out
+            return
+        one_year_ago = _first_day(now - timedelta(days=365))
+        for contact_key, user_logs in self.logs.items():
+            if any(ts < one_year_ago for ts in user_logs):
+                self.logs[contact_key] = {
+                    ts: count for ts, count in user_logs.items() if
+                    ts >= one_year_ago}
+                if len(self.logs[contact_key]) == 0:  # latest post aged out
+                    self.last_post.pop(contact_key, None)
+        self.pruned_on = today
+
+    def _save(self) -> None:
+        """Save any changed subscribers and logs data to disk."""
+        with self.lock:
+            self.save_timer = None
+            if self.subscribers_dirty:
+                _write_encrypted(
+                    self.json_file, self.backup_file, self.fernet,
+                    self.subscribers)
+                self.subscribers_dirty = False
+            if self.logs_dirty:
+                self._prune_logs()
+                # Everything journaled so far will be in the logs file, so tag
+                # it with a new generation; if a crash keeps the journal from
+                # being emptied below, the old entries are skipped on replay
+                self.logs_generation += 1
+                _write_encrypted(
+                    self.logs_file, self.backup_logs_file, self.logs_fernet,
+                    {consts.GENERATION: self.logs_generation, **self.logs})
+                # Everything journaled or waiting to be is in the logs file now
+                _write_atomically(self.logs_journal_file, b"")
+                self.journaled = 0
+                self.journal_pending = []
+                self.logs_dirty = False
+
+    def _save_soon(self) -> None:
+        """Save changed data after a short wait.
+
+        Changes made while waiting are saved along with the first, so a burst of
+        changes costs one write instead of one each. Call with lock held.
+        """
+        if self.save_timer is None:
+            self.save_timer = threading.Timer(consts.SAVE_WAIT, self._save)
+            self.save_timer.start()
 
     def _reply(self, msg_body: str) -> str:
         """Reply to a message to the bot.
@@ -210,17 +528,51 @@ class Chatbot:
         Returns:
             A string suitable for returning from a route function.
         """
-        resp = MessagingResponse()
-        msg = resp.message()
-        msg.body(msg_body)
-        return str(resp)
+        # Same output as Twilio's MessagingResponse without building and
+        # serializing an XML tree for every reply
+        return consts.TWIML_PREFIX + escape(msg_body) + consts.TWIML_SUFFIX
 
-    def _push(self, text: str, sender: str, media_urls: List[str]) -> str:
+    def _send(self, recipient: str, body: str, media_urls: List[str]) -> str:
+        """Send a message and media to a single recipient through Twilio.
+
+        Arguments:
+            recipient -- Recipient's WhatsApp contact info
+            body -- Contents of the message
+            media_urls -- a list of media URLs to send, if any
+
+        Returns:
+            The SID of the sent message.
+        """
+        if self.messaging_service_sid is not None:
+            # Let the Messaging Service queue and pace sends on Twilio's end
+            msg = self.client.messages.create(
+                messaging_service_sid=self.messaging_service_sid,
+                to=recipient,
+                body=body,
+                media_url=media_urls)
+        else:
+            msg = self.client.messages.create(
+                from_=self.whatsapp_number,
+                to=recipient,
+                body=body,
+                media_url=media_urls)
+        return msg.sid
+
+    def _push(
+            self,
+            text: str,
+            sender_name: str,
+            sender: str,
+            media_urls: List[str]) -> str:
         """Push a translated message and media to one or more recipients.
 
+        Only the message itself is translated, so the same text from different
+        senders shares cached translations; the sender's name is added after.
+
         Arguments:
             text -- Contents of the message
-            sender -- Sender"s WhatsApp contact info
+            sender_name -- Sender's display name
+            sender -- Sender's WhatsApp contact info
             media_urls -- a list of media URLs to send, if any
 
         Returns:
@@ -228,27 +580,168 @@ class Chatbot:
                 request to the LibreTranslate API times out or has some other
                 error.
         """
-        translations: Dict[str, str] = {}  # cache previously translated values
-        for s in self.subscribers.keys():
-            if s != sender:
-                if self.subscribers[s]["lang"] in translations:
-                    translated = translations[self.subscribers[s]["lang"]]
-                else:
-                    try:
-                        translated = translate_to(
-                            text, self.subscribers[s]["lang"])
-                    except (TimeoutError, requests.ReadTimeout,
-                            requests.ConnectionError, requests.HTTPError):
-                        return consts.API_OFFLINE
-                    translations[self.subscribers[s]["lang"]] = translated
-                msg = self.client.messages.create(
-                    from_=f"whatsapp:{self.number}",
-                    to=s,
-                    body=translated,
-                    media_url=media_urls)
-                print(msg.sid)
+        # Recipients grouped by language, leaving out the sender; copy them
+        # under the lock since /add and /remove change the groups in place
+        with self.lock:
+            groups = [(lang, list(contacts - {sender}))
+                      for lang, contacts in self.lang_groups.items()]
+        groups = [(lang, members) for lang, members in groups if members]
+        # Translate into every language at once rather than one at a time
+        try:
+            translations = translate_to_many(
+                text, (lang for lang, _ in groups)) if text != "" else {}
+        except (TimeoutError, requests.ReadTimeout,
+                requests.ConnectionError, requests.HTTPError):
+            return consts.API_OFFLINE
+        # Likewise for the header, which is only translated once per language
+        says = Chatbot.languages.get_says_many(  # type: ignore [union-attr]
+            lang for lang, _ in groups)
+        recipients: List[str] = []
+        bodies: List[str] = []
+        for lang, members in groups:
+            body = f"{sender_name} {says[lang]}\n{translations.get(lang, '')}"
+            recipients += members
+            bodies += [body] * len(members)
+        # Send to all recipients at once rather than waiting on each in turn
+        sends = {
+            self.send_pool.submit(self._send, recipient, body, media_urls):
+            recipient for recipient, body in zip(recipients, bodies)}
+        for send in as_completed(sends):  # wait for every send
+            try:
+                logger.debug("Sent %s to %s", send.result(), sends[send])
+            except Exception:  # pylint: disable=broad-exception-caught
+                # One failed recipient shouldn't hide how the others went
+                logger.exception("Failed to send message to %s", sends[send])
+        return ""
+
+    def _push_in_background(
+            self,
+            text: str,
+            sender_name: str,
+            sender: str,
+            media_urls: List[str]) -> None:
+        """Push a group message, reporting any failure to the sender.
+
+        Arguments:
+            text -- Contents of the message
+            sender_name -- Sender's display name
+            sender -- Sender's WhatsApp contact info
+            media_urls -- a list of media URLs to send, if any
+        """
+        try:
+            err = self._push(text, sender_name, sender, media_urls)
+            if err != "":  # the sender is no longer waiting on a reply
+                self._send(sender, err, [])
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Nothing is waiting on this thread to report the error
+            logger.exception("Failed to push message from %s", sender)
+
+    def _enqueue_push(
+            self,
+            text: str,
+            sender_name: str,
+            sender: str,
+            media_urls: List[str]) -> str:
+        """Queue a group message to be pushed without blocking the webhook.
+
+        Messages from the same sender always share a queue, so they are
+        delivered in the order they were received. Queued messages are still
+        pushed when the worker stops gracefully (see shutdown), and once it has
+        started stopping, messages are pushed right away instead.
+
+        Arguments:
+            text -- Contents of the message
+            sender_name -- Sender's display name
+            sender -- Sender's WhatsApp contact info
+            media_urls -- a list of media URLs to send, if any
+
+        Returns:
+            An empty string to the sender.
+        """
+        queue = self.push_queues[hash(sender) % len(self.push_queues)]
+        try:
+            queue.submit(
+                self._push_in_background, text, sender_name, sender, media_urls)
+        except RuntimeError:  # the queues have been shut down for exiting
+            self._push_in_background(text, sender_name, sender, media_urls)
+        return ""
+
+    def _flush_buffer(self, sender: str) -> None:
+        """Push the messages a sender has sent in the last few moments together.
+
+        Arguments:
+            sender -- Sender's WhatsApp contact info
+        """
+        with self.buffer_lock:
+            pending = self.buffers.pop(sender, None)
+            if pending is not None:
+                (sender_name, msgs, timer) = pending
+                timer.cancel()  # in case this wasn't called by the timer
+                self._enqueue_push("\n".join(msgs), sender_name, sender, [])
+
+    def _buffer_push(
+            self,
+            msg: str,
+            sender_name: str,
+            sender: str,
+            media_urls: List[str]) -> str:
+        """Hold a group message briefly in case the sender sends more.
+
+        People often send several short messages in a row. Pushing them as one
+        saves a translation and a message to every recipient for each.
+
+        Arguments:
+            msg -- Contents of the message
+            sender_name -- Sender's display name
+            sender -- Sender's WhatsApp contact info
+            media_urls -- a list of media URLs to send, if any
+
+        Returns:
+            An empty string to the sender.
+        """
+        with self.buffer_lock:
+            pending = self.buffers.pop(sender, None)
+            msgs = [msg]
+            if pending is not None:
+                pending[2].cancel()
+                msgs = pending[1] + msgs
+            if len(media_urls) > 0 or len(msgs) >= consts.BUFFER_MAX or \
+                    self.shut_down:
+                # WhatsApp allows one attachment per message, so media isn't
+                # combined; push it with whatever was waiting. Nothing is held
+                # once shutting down, since it wouldn't be pushed
+                self._enqueue_push(
+                    "\n".join(msgs), sender_name, sender, media_urls)
+            else:  # wait for more
+                timer = threading.Timer(
+                    consts.BUFFER_WAIT, self._flush_buffer, [sender])
+                self.buffers[sender] = (sender_name, msgs, timer)
+                timer.start()
         return ""
 
+    def shutdown(self) -> None:
+        """Push queued and held group messages before exiting.
+
+        The webhook has already answered Twilio for these messages, so they
+        would otherwise be lost. Pushing them needs the thread pools, so this
+        runs when the interpreter starts exiting, before the pools stop taking
+        work, and when a Gunicorn worker stops; only the first call does
+        anything.
+        """
+        with self.buffer_lock:
+            if self.shut_down:
+                return
+            self.shut_down = True
+            pending = list(self.buffers.items())
+            self.buffers.clear()
+        for _, (_, _, timer) in pending:
+            timer.cancel()
+        # Held messages came after the queued ones, so finish those first
+        for queue in self.push_queues:
+            queue.shutdown(wait=True)
+        for sender, (sender_name, msgs, _) in pending:
+            self._push_in_background("\n".join(msgs), sender_name, sender, [])
+
     def _query(
             self,
             msg: str,
@@ -273,34 +766,34 @@ class Chatbot:
         """
         if not (msg == "" and len(media_urls) == 0):  # something to send
             # Check if recipient exists
-            r = self.display_names.get(recipient, "")
-            if r == "":  # not a display name; check if it's a phone number
-                if f"whatsapp:{recipient}" not in self.subscribers:  # nope
+            r = self.display_names.get(recipient)
+            if r is None:  # not a display name; check if it's a phone number
+                r = "whatsapp:" + recipient
+                if r not in self.subscribers:  # nope
                     return Chatbot.languages.get_unfound_err(  # type: ignore [union-attr]
                         sender_lang)
-                else:  # is number
-                    r = f"whatsapp:{recipient}"
             # Send message
             recipient_lang = self.subscribers[r]["lang"]
-            text = f"Private message from {sender}:\n{msg}"
+            # Translate the message by itself so it can share cached
+            # translations, and add the sender's name after
             try:
-                translated = translate_to(text, recipient_lang)
+                translated = translate_to(
+                    msg, recipient_lang) if msg != "" else ""
             except (TimeoutError, requests.ReadTimeout,
                     requests.ConnectionError, requests.HTTPError):
                 return consts.API_OFFLINE
-            pm = self.client.messages.create(
-                from_=f"whatsapp:{self.number}",
-                to=r,
-                body=translated,
-                media_url=media_urls)
-            print(pm.sid)
+            header = Chatbot.languages.get_private_msg(  # type: ignore [union-attr]
+                recipient_lang)
+            sid = self._send(r, f"{header} {sender}:\n{translated}", media_urls)
+            logger.debug("Sent %s to %s", sid, r)
         return ""
 
-    def _test_translate(self, msg: str, sender: str) -> str:
+    def _test_translate(self, parts: List[str], sender: str) -> str:
         """Translate a string to a language, then to a user"s native language.
 
         Arguments:
-            msg -- message to translate
+            parts -- words of the message sent to the bot, including the
+                command, target language, and text to translate
             sender -- number of the user requesting the translation
 
         Returns:
@@ -308,17 +801,18 @@ class Chatbot:
                 the LibreTranslate API times out or has some other error.
         """
         sender_lang = self.subscribers[sender]["lang"]
-        try:
-            l = msg.split()[1].lower()
-            if l not in Chatbot.languages.codes:  # type: ignore [union-attr]
-                return Chatbot.languages.get_test_example(  # type: ignore [union-attr]
-                    sender_lang)
-        except IndexError:
+        if len(parts) < 2:
+            return Chatbot.languages.get_test_example(  # type: ignore [union-attr]
+                sender_lang)
+        l = parts[1].lower()
+        if l not in Chatbot.languages.codes_set:  # type: ignore [union-attr]
             return Chatbot.languages.get_test_example(  # type: ignore [union-attr]
                 sender_lang)
         # Translate to requested language then back to native language
-        text = " ".join(msg.split()[2:])
+        text = " ".join(parts[2:])
         if text != "":
+            if l == sender_lang:  # nothing to translate there and back
+                return text
             try:
                 translated = translate_to(text, l)
                 return translate_to(translated, sender_lang)
@@ -328,24 +822,24 @@ class Chatbot:
         return Chatbot.languages.get_test_example(  # type: ignore [union-attr]
             sender_lang)
 
-    def _add_subscriber(self, msg: str, sender_contact: str) -> str:
+    def _add_subscriber(self, parts: List[str], sender_contact: str) -> str:
         """Add a new subscriber to the dictionary and save it to the JSON file.
 
         Arguments:
-            msg -- the message sent to the bot
+            parts -- words of the message sent to the bot
             sender_contact -- WhatsApp contact info of the sender
 
         Returns:
             A string suitable for returning from a Flask route endpoint.
         """
-        sender_lang = self.subscribers[sender_contact]["lang"]
-        sender_role = self.subscribers[sender_contact]["role"]
-        parts = msg.split()
+        sender = self.subscribers[sender_contact]
+        sender_lang = sender["lang"]
+        sender_role = sender["role"]
         if len(parts) == 5:  # Check if there are enough arguments
             new_contact = parts[1]
             new_name = parts[2]
-            new_lang = parts[3]
-            new_role = parts[4]
+            new_lang = sys.intern(parts[3])
+            new_role = sys.intern(parts[4])
             # Check if the sender has the authority to add the specified role
             if sender_role == consts.ADMIN and new_role == consts.SUPER:
                 return ""
@@ -354,140 +848,102 @@ class Chatbot:
                 ) or (not new_contact[1:].isdigit()):
                 return Chatbot.languages.get_add_phone_err(  # type: ignore [union-attr]
                     sender_lang)
-            # start attempt to add contact
-            new_contact_key = f"whatsapp:{new_contact}"
-            # Check if the user already exists
-            if new_contact_key in self.subscribers:
-                return Chatbot.languages.get_exists_err(  # type: ignore [union-attr]
-                    sender_lang)
-            # Check if the display name is untaken and valid
-            if new_name in self.display_names or new_name.startswith(
-                    "whatsapp:"):
-                return Chatbot.languages.get_add_name_err(  # type: ignore [union-attr]
-                    sender_lang)
-            # Check if the language code is valid
-            if new_lang not in\
-                    Chatbot.languages.codes:  # type: ignore [union-attr]
-                return Chatbot.languages.get_add_lang_err(  # type: ignore [union-attr]
-                    sender_lang)
-            # Check if the role is valid
-            if new_role not in consts.VALID_ROLES:
-                return Chatbot.languages.get_add_role_err(  # type: ignore [union-attr]
+            with self.lock:
+                # start attempt to add contact
+                new_contact_key = "whatsapp:" + new_contact
+                # Check if the user already exists
+                if new_contact_key in self.subscribers:
+                    return Chatbot.languages.get_exists_err(  # type: ignore [union-attr]
+                        sender_lang)
+                # Check if the display name is untaken and valid
+                if new_name in self.display_names or new_name.startswith(
+                        "whatsapp:"):
+                    return Chatbot.languages.get_add_name_err(  # type: ignore [union-attr]
+                        sender_lang)
+                # Check if the language code is valid
+                if new_lang not in\
+                        Chatbot.languages.codes_set:  # type: ignore [union-attr]
+                    return Chatbot.languages.get_add_lang_err(  # type: ignore [union-attr]
+                        sender_lang)
+                # Check if the role is valid
+                if new_role not in consts.VALID_ROLES:
+                    return Chatbot.languages.get_add_role_err(  # type: ignore [union-attr]
+                        sender_lang)
+                self.subscribers[new_contact_key] = {
+                    "name": new_name,
+                    "lang": new_lang,
+                    "role": new_role
+                }
+                self.display_names[new_name] = new_contact_key
+                self.lang_groups.setdefault(new_lang, set()).add(
+                    new_contact_key)
+                # Add new user to the timestamp logs
+                self.logs[new_contact_key] = {}
+                # Save the updated subscribers and logs
+                self.subscribers_dirty = True
+                self.logs_dirty = True
+                self._save_soon()
+                # Success!
+                return Chatbot.languages.get_add_success(  # type: ignore [union-attr]
                     sender_lang)
-            self.subscribers[new_contact_key] = {
-                "name": new_name,
-                "lang": new_lang,
-                "role": new_role
-            }
-            self.display_names[new_name] = new_contact_key
-            # Save the updated subscribers to subscribers.json
-            # Convert the dictionary of subscribers to a formatted JSON string
-            subscribers_list = json.dumps(self.subscribers, indent=4)
-            # Create byte version of JSON string
-            subscribers_list_byte = subscribers_list.encode("utf-8")
-            f = Fernet(self.key)
-            encrypted_data = f.encrypt(subscribers_list_byte)
-            with open(self.json_file, "wb") as file:
-                file.write(encrypted_data)
-            # Copy data to backup file
-            with open(self.json_file, "rb") as fileone, \
-                    open(self.backup_file, "wb") as filetwo:
-                for line in fileone:
-                    filetwo.write(line)
-            # Add new user to the timestamp logs
-            self.logs[new_contact_key] = {}
-            # Convert the dictionary of logs to a formatted JSON string
-            logs_list = json.dumps(self.logs, indent=4)
-            # Create byte version of JSON string
-            logs_list_byte = logs_list.encode("utf-8")
-            f = Fernet(self.key2)
-            encrypted_data = f.encrypt(logs_list_byte)
-            with open(self.logs_file, "wb") as file:
-                file.write(encrypted_data)
-            # Copy data to backup file
-            with open(self.logs_file, "rb") as fileone, \
-                    open(self.backup_logs_file, "wb") as filetwo:
-                for line in fileone:
-                    filetwo.write(line)
-            # Success!
-            return Chatbot.languages.get_add_success(  # type: ignore [union-attr]
-                sender_lang)
         else:
             return Chatbot.languages.get_add_err(  # type: ignore [union-attr]
                 sender_lang)
 
-    def _remove_subscriber(self, msg: str, sender_contact: str) -> str:
+    def _remove_subscriber(
+            self,
+            parts: List[str],
+            sender_contact: str) -> str:
         """Remove a subscriber from the dictionary and save the dictionary.
 
         to the JSON file.
 
         Arguments:
-            msg -- the message sent to the bot
+            parts -- words of the message sent to the bot
             sender_contact -- WhatsApp contact info of the sender
 
         Returns:
             A string suitable for returning from a Flask route endpoint,
                 indicating the result of the removal attempt.
         """
-        sender_lang = self.subscribers[sender_contact]["lang"]
-        sender_role = self.subscribers[sender_contact]["role"]
-        parts = msg.split()
+        sender = self.subscribers[sender_contact]
+        sender_lang = sender["lang"]
+        sender_role = sender["role"]
         if len(parts) == 2:  # Check if there are enough arguments
-            user_contact = parts[1]  # user to attempt to remove
-            # Check if user exists
-            user_contact = self.display_names.get(parts[1], "")
-            if user_contact == "":  # not a display name; check if it's a number
-                if f"whatsapp:{parts[1]}" not in self.subscribers:  # nope
-                    return Chatbot.languages.get_unfound_err(  # type: ignore [union-attr]
+            with self.lock:
+                # Check if user exists
+                user_contact = self.display_names.get(parts[1])
+                if user_contact is None:  # not a display name; check if it's a number
+                    user_contact = "whatsapp:" + parts[1]
+                    if user_contact not in self.subscribers:  # nope
+                        return Chatbot.languages.get_unfound_err(  # type: ignore [union-attr]
+                            sender_lang)
+                # Prevent sender from removing themselves
+                if user_contact == sender_contact:
+                    return Chatbot.languages.get_remove_self_err(  # type: ignore [union-attr]
                         sender_lang)
-                else:  # is number
-                    user_contact = f"whatsapp:{parts[1]}"
-            # Prevent sender from removing themselves
-            if user_contact == sender_contact:
-                return Chatbot.languages.get_remove_self_err(  # type: ignore [union-attr]
-                    sender_lang)
-            # Check if the sender has the necessary privileges
-            if sender_role == consts.ADMIN and self.subscribers[
-                    user_contact]["role"] == consts.SUPER:
-                return Chatbot.languages.get_remove_super_err(  # type: ignore [union-attr]
+                # Check if the sender has the necessary privileges
+                if sender_role == consts.ADMIN and self.subscribers[
+                        user_contact]["role"] == consts.SUPER:
+                    return Chatbot.languages.get_remove_super_err(  # type: ignore [union-attr]
+                        sender_lang)
+                else:
+                    # Delete subscriber
+                    name = self.subscribers[user_contact]["name"]
+                    lang = self.subscribers[user_contact]["lang"]
+                    del self.display_names[name]
+                    del self.subscribers[user_contact]
+                    self.lang_groups[lang].discard(user_contact)
+                    # Delete their chat logs
+                    del self.logs[user_contact]
+                    self.last_post.pop(user_contact, None)
+                # Save the updated subscribers and logs
+                self.subscribers_dirty = True
+                self.logs_dirty = True
+                self._save_soon()
+                # Success!
+                return Chatbot.languages.get_remove_success(  # type: ignore [union-attr]
                     sender_lang)
-            else:
-                # Delete subscriber
-                name = self.subscribers[user_contact]["name"]
-                del self.display_names[name]
-                del self.subscribers[user_contact]
-                # Delete their chat logs
-                del self.logs[user_contact]
-            # Save the updated subscribers to subscribers.json
-            # Convert the dictionary of subscribers to a formatted JSON string
-            subscribers_list = json.dumps(self.subscribers, indent=4)
-            # Create byte version of JSON string
-            subscribers_list_byte = subscribers_list.encode("utf-8")
-            f = Fernet(self.key)
-            encrypted_data = f.encrypt(subscribers_list_byte)
-            with open(self.json_file, "wb") as file:
-                file.write(encrypted_data)
-            # Copy data to backup file
-            with open(self.json_file, "rb") as fileone, \
-                    open(self.backup_file, "wb") as filetwo:
-                for line in fileone:
-                    filetwo.write(line)
-            # Save updated chat logs to logs.json
-            logs_list = json.dumps(self.subscribers, indent=4)
-            # Create byte version of JSON string
-            logs_list_byte = logs_list.encode("utf-8")
-            f = Fernet(self.key2)
-            encrypted_data = f.encrypt(logs_list_byte)
-            with open(self.logs_file, "wb") as file:
-                file.write(encrypted_data)
-            # Copy data to backup file
-            with open(self.logs_file, "rb") as fileone, \
-                    open(self.backup_logs_file, "wb") as filetwo:
-                for line in fileone:
-                    filetwo.write(line)
-            # Success!
-            return Chatbot.languages.get_remove_success(  # type: ignore [union-attr]
-                sender_lang)
         else:
             return Chatbot.languages.get_remove_err(  # type: ignore [union-attr]
                 sender_lang)
@@ -503,60 +959,47 @@ class Chatbot:
         """
         # Only proceed if message is not a command and is not an empty PM
         if not msg.startswith("/") and not (msg.startswith(pm_char) and
-                                            len(msg.split()) <= 1):
-            timestamp = datetime.now().strftime("%Y-%m-%d")
-            if timestamp in self.logs[sender_contact]:
-                self.logs[sender_contact][timestamp] += 1
-            else:
-                self.logs[sender_contact][timestamp] = 1
-            # Remove messages older than 1 year
-            one_year_ago = datetime.now() - timedelta(days=365)
-            for contact_key in self.logs:
-                self.logs[contact_key] = {
-                    ts: count for ts, count in self.logs[contact_key].items() if
-                    datetime.fromisoformat(ts) >= one_year_ago}
-            # Save the updated logs to logs.json
-            # Convert the logs dictionary to a formatted JSON string
-            logs_list = json.dumps(self.logs, indent=4)
-            # Create byte version of JSON string
-            logs_list_byte = logs_list.encode("utf-8")
-            f = Fernet(self.key2)
-            encrypted_logs_data = f.encrypt(logs_list_byte)
-            with open(self.logs_file, "wb") as file:
-                file.write(encrypted_logs_data)
-            # Copy data to backup file
-            with open(self.logs_file, "rb") as fileone, \
-                    open(self.backup_logs_file, "wb") as filetwo:
-                for line in fileone:
-                    filetwo.write(line)
-
-    def _generate_stats(self, sender_contact: str, msg: str) -> str:
+                                            len(msg.split(maxsplit=1)) <= 1):
+            with self.lock:
+                timestamp = datetime.now().strftime("%Y-%m-%d")
+                if timestamp in self.logs[sender_contact]:
+                    self.logs[sender_contact][timestamp] += 1
+                else:
+                    self.logs[sender_contact][timestamp] = 1
+                self.last_post[sender_contact] = timestamp
+                # Record just this message; old messages are removed and the
+                # logs file rewritten when the journal is folded into it
+                self._journal_timestamp(sender_contact, timestamp)
+
+    def _generate_stats(
+            self,
+            sender_contact: str,
+            split_msg: List[str]) -> str:
         """Generate message statistics for one or all users.
 
         Arguments:
             sender_contact -- WhatsApp contact info of the sender
-            msg -- the message sent to the bot, containing the user contact,
-                and the time frame for statistics
+            split_msg -- words of the message sent to the bot, containing the
+                user contact and the time frame for statistics
 
         Returns:
             A string containing the message statistics or an error message
                 if the input is incorrect or the user is not found.
         """
         sender_lang = self.subscribers[sender_contact]["lang"]
-        split_msg = msg.split()  # Check if there are enough arguments
+        # Check if there are enough arguments
         if len(split_msg) in (3, 4):
             days_str = split_msg[1]
             unit = split_msg[2]
             if len(split_msg) == 4:  # specific user
-                target_contact = self.display_names.get(split_msg[3], "")
+                target_contact = self.display_names.get(split_msg[3])
                 target_name = split_msg[3]
-                if target_contact == "":  # not a display name, check if it's a number
-                    if f"whatsapp:{split_msg[3]}" not in self.subscribers:  # nope
+                if target_contact is None:  # not a display name, check if it's a number
+                    target_contact = "whatsapp:" + split_msg[3]
+                    if target_contact not in self.subscribers:  # nope
                         return Chatbot.languages.get_unfound_err(  # type: ignore [union-attr]
                             sender_lang)
-                    else:  # is number
-                        target_contact = f"whatsapp:{split_msg[3]}"
-                        target_name = self.subscribers[target_contact]["name"]
+                    target_name = self.subscribers[target_contact]["name"]
             else:
                 target_contact = ""
             time_frame = f"{days_str}{unit}"
@@ -564,8 +1007,7 @@ class Chatbot:
             return Chatbot.languages.get_stats_usage_err(  # type: ignore [union-attr]
                 sender_lang)
         # Check if the time frame is valid
-        pattern = r"(\d+)\s*(\w+)"
-        match = re.match(pattern, time_frame)
+        match = consts.TIME_FRAME.match(time_frame)
         if match:
             days, unit = int(match.group(1)), match.group(2)
             if unit not in ("day", "days"):
@@ -577,14 +1019,16 @@ class Chatbot:
         # Calculate the start and end dates
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
+        # Compare log dates as strings rather than parsing each one
+        start_str = _first_day(start_date)
+        end_str = end_date.date().isoformat()
         report = Chatbot.languages.get_stats_headers(  # type: ignore [union-attr]
             sender_lang)  # report to return
         # Tally timestamps for a specific user
         if target_contact != "":
             message_count = 0
             for timestamp_str, count in self.logs[target_contact].items():
-                timestamp = datetime.fromisoformat(timestamp_str)
-                if start_date <= timestamp <= end_date:
+                if start_str <= timestamp_str <= end_str:
                     message_count += count
             phone = target_contact.split(":")[1]
             report += f"\n{target_name}, {phone}, {message_count}"
@@ -595,11 +1039,10 @@ class Chatbot:
                 name = self.subscribers[contact_key]["name"]
                 phone = contact_key.split(":")[1]
                 user_message_count = 0
-                for timestamp_str in self.logs[contact_key]:
-                    timestamp = datetime.fromisoformat(timestamp_str)
-                    if start_date <= timestamp <= end_date:
-                        total_message_count += 1
-                        user_message_count += 1
+                for timestamp_str, count in self.logs[contact_key].items():
+                    if start_str <= timestamp_str <= end_str:
+                        total_message_count += count
+                        user_message_count += count
                 report += f"\n{name}, {phone}, {user_message_count}"
             report += f"\n\nTOTAL: {total_message_count}"  # sum
         # Return report
@@ -628,33 +1071,30 @@ class Chatbot:
         # Specific user
         if target_user != "":
             # Check if recipient exists
-            target_number = self.display_names.get(target_user, "")
-            if target_number == "":  # not a display name; check if it's a phone number
-                if f"whatsapp:{target_user}" not in self.subscribers:  # nope
+            target_number = self.display_names.get(target_user)
+            if target_number is None:  # not a display name; check if it's a phone number
+                target_number = "whatsapp:" + target_user
+                if target_number not in self.subscribers:  # nope
                     return Chatbot.languages.get_unfound_err(  # type: ignore [union-attr]
                         sender_lang)
-                else:  # is number
-                    target_number = f"whatsapp:{target_user}"
-                    target_name = self.subscribers[target_number]["name"]
+                target_name = self.subscribers[target_number]["name"]
             else:  # was a display name
                 target_name = target_user
-            # Locate user's timestamps
+            # Look up user's latest timestamp
             phone = target_number.split(":")[1]  # remove "whatsapp:"
-            timestamps = self.logs[target_number]
-            if len(timestamps) == 0:
+            last_post_time = self.last_post.get(target_number)
+            if last_post_time is None:
                 return Chatbot.languages.get_no_posts(  # type: ignore [union-attr]
                     sender_lang)
-            last_post_time = max(timestamps, key=datetime.fromisoformat)
             report += f"\n{target_name}, {phone}, {last_post_time}"
         # All users
         else:
             last_posts = []
-            for user, user_logs in self.logs.items():
-                if len(user_logs) != 0:
-                    name = self.subscribers[user]["name"]
-                    phone = user.split(":")[1]
-                    last_post_time = max(user_logs, key=datetime.fromisoformat)
-                    last_posts.append(f"{name}, {phone}, {last_post_time}")
+            # Copy since a message from a first-time poster adds an entry
+            for user, last_post_time in list(self.last_post.items()):
+                name = self.subscribers[user]["name"]
+                phone = user.split(":")[1]
+                last_posts.append(f"{name}, {phone}, {last_post_time}")
             if not last_posts:
                 return Chatbot.languages.get_no_posts(  # type: ignore [union-attr]
                     sender_lang)
@@ -662,6 +1102,20 @@ class Chatbot:
         # Return report
         return report
 
+    def _last_post_cmd(self, parts: List[str], sender_contact: str) -> str:
+        """Handle the /lastpost command.
+
+        Arguments:
+            parts -- words of the message sent to the bot, optionally naming a
+                user
+            sender_contact -- WhatsApp contact info of the sender
+
+        Returns:
+            The report from _get_last_post_time().
+        """
+        target_user = parts[1] if len(parts) > 1 else ""
+        return self._get_last_post_time(sender_contact, target_user)
+
     def _list_subscribers(self, sender: str) -> str:
         """Generate a formatted list of subscribers with their data.
 
@@ -700,29 +1154,33 @@ class Chatbot:
         Returns:
             A string suitable for returning from a Flask route endpoint.
         """
-        try:
-            sender = self.subscribers[sender_contact]
-            sender_name = sender["name"]
-            role = sender["role"]
-            sender_lang = sender["lang"]
-        except KeyError:
-            return ""  # ignore; they aren't subscribed
         if msg == "" and len(media_urls) == 0:
             return ""  # ignore; nothing to send
+        sender = self.subscribers.get(sender_contact)
+        if sender is None:
+            return ""  # ignore; they aren't subscribed
+        sender_name = sender["name"]
+        role = sender["role"]
+        sender_lang = sender["lang"]
 
         # Store the timestamp if applicable
         self._store_message_timestamp(sender_contact, msg)
 
-        # first word in message
-        word_1 = msg.split()[0].lower() if msg != "" else ""
+        # first word in message and the rest as typed (stop splitting after
+        # the first word, since only commands need every word)
+        split = msg.split(maxsplit=1)
+        word_1 = split[0] if split else ""
+        if word_1.startswith("/"):  # only commands are case-insensitive
+            word_1 = word_1.lower()
 
         # PM someone:
-        if word_1[0:1] == pm_char:
-            split = msg.split()  # don't convert first word to lowercase
-            pm_name = split[0][1:]  # display name without PM character
+        if word_1.startswith(pm_char):
+            # Don't convert first word to lowercase, and leave the rest of the
+            # message as it was typed instead of splitting and rejoining it
+            pm_name = split[0].removeprefix(pm_char)  # display name
             return self._reply(
                 self._query(
-                    " ".join(split[1:]),
+                    split[1] if len(split) > 1 else "",
                     sender_name,
                     sender_lang,
                     pm_name,
@@ -731,55 +1189,68 @@ class Chatbot:
         # Message group or /test as user:
         elif role == consts.USER:
             if word_1 == consts.TEST:  # test translate
-                return self._reply(self._test_translate(msg, sender_contact))
-            elif word_1[0:1] == "/" and len(word_1) > 1:
+                return self._reply(
+                    self._test_translate(msg.split(), sender_contact))
+            elif word_1.startswith("/") and word_1 != "/":
                 return ""  # ignore invalid/unauthorized command
             else:  # just send a message
-                text = sender_name + " says:\n" + msg
-                self._push(text, sender_contact, media_urls)
-                return ""  # say nothing to sender
+                return self._buffer_push(
+                    msg, sender_name, sender_contact, media_urls)
 
         # Message group or perform any slash command as admin or superuser:
         else:
-            match word_1:
-                case consts.TEST:  # test translate
-                    return self._reply(
-                        self._test_translate(
-                            msg, sender_contact))
-                case consts.ADD:  # add user to subscribers
-                    return self._reply(
-                        self._add_subscriber(
-                            msg, sender_contact))
-                case consts.REMOVE:  # remove user from subscribers
-                    return self._reply(
-                        self._remove_subscriber(
-                            msg, sender_contact))
-                case consts.LIST:  # list all subscribers with their data
-                    return self._reply(self._list_subscribers(sender_contact))
-                case consts.STATS:
-                    stats = self._generate_stats(sender_contact, msg)
-                    return self._reply(stats)
-                case consts.LASTPOST:  # get last post time for user
-                    target_user = msg.split()[1] if len(
-                        msg.split()) > 1 else ""
-                    return self._reply(
-                        self._get_last_post_time(
-                            sender_contact, target_user))
-                case _:  # just send a message
-                    if word_1[0:1] == "/" and len(word_1) > 1:
-                        return ""  # ignore invalid/unauthorized command
-                    text = sender_name + " says:\n" + msg
-                    return self._push(text, sender_contact, media_urls)
-
-
-# Create bot (keyword args not provided because they have defaults)
+            handler = self.admin_commands.get(word_1)
+            if handler is not None:  # perform slash command
+                return self._reply(handler(msg.split(), sender_contact))
+            elif word_1.startswith("/") and word_1 != "/":
+                return ""  # ignore invalid/unauthorized command
+            else:  # just send a message
+                return self._buffer_push(
+                    msg, sender_name, sender_contact, media_urls)
+
+
+# Create bot (file keyword args not provided because they have defaults)
 TWILIO_ACCOUNT_SID: str = os.getenv(
     "TWILIO_ACCOUNT_SID")  # type: ignore [assignment]
 TWILIO_AUTH_TOKEN: str = os.getenv(
     "TWILIO_AUTH_TOKEN")  # type: ignore [assignment]
 TWILIO_NUMBER: str = os.getenv("TWILIO_NUMBER")  # type: ignore [assignment]
-mr_botty = Chatbot(
-    TWILIO_ACCOUNT_SID,
-    TWILIO_AUTH_TOKEN,
-    TWILIO_NUMBER)
+# Optional; if unset, messages are sent directly from TWILIO_NUMBER
+TWILIO_MESSAGING_SERVICE_SID: str | None = os.getenv(
+    "TWILIO_MESSAGING_SERVICE_SID")
+
+_mr_botty: Chatbot | None = None
 """Global Chatbot object, of which there could theoretically be many."""
+_mr_botty_lock = threading.Lock()
+
+
+def get_bot() -> Chatbot:
+    """Get the chatbot used by the Flask app, creating it on first use.
+
+    Creating it loads language data and both encrypted data files, so it's put
+    off until the bot is needed rather than done whenever this module is
+    imported.
+
+    Returns:
+        The global Chatbot object.
+    """
+    global _mr_botty  # pylint: disable=global-statement
+    with _mr_botty_lock:
+        if _mr_botty is None:
+            _mr_botty = Chatbot(
+                TWILIO_ACCOUNT_SID,
+                TWILIO_AUTH_TOKEN,
+                TWILIO_NUMBER,
+                messaging_service_sid=TWILIO_MESSAGING_SERVICE_SID)
+        return _mr_botty
+
+
+def shutdown_bot() -> None:
+    """Push the messages the Flask app's chatbot is holding before exiting.
+
+    Does nothing if the chatbot was never created.
+    """
+    with _mr_botty_lock:
+        bot = _mr_botty
+    if bot is not None:
+        bot.shutdown()
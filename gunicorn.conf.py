@@ -0,0 +1,52 @@
+"""Gunicorn configuration for the WhatsApp chatbot.
+
+Gunicorn loads this file automatically when started from the repository root,
+e.g., with `gunicorn -b 0.0.0.0:8080 'wsgi:app'`.
+
+Every webhook spends most of its time waiting on HTTPS requests to Twilio and
+LibreTranslate, so a single synchronous worker would serialize those waits.
+Gevent workers let them overlap instead, yielding to other requests whenever a
+socket would block. Subscriber data is held in memory by each worker process, so
+there must be exactly one worker; concurrency comes from greenlets.
+"""
+
+import os
+
+
+def _get_connections() -> int:
+    """Populate the connection limit from the environment.
+
+    Returns:
+        The integer value of the environment variable GUNICORN_CONNECTIONS, or
+            1000 if the variable is nonnumeric or nonexistent.
+    """
+    try:
+        return int(os.getenv("GUNICORN_CONNECTIONS"))  # type: ignore [arg-type]
+    except (ValueError, TypeError):
+        return 1000
+
+
+worker_class = "gevent"
+workers = 1  # more than one would split subscriber data between processes
+worker_connections = _get_connections()
+
+
+def post_worker_init(worker) -> None:  # pylint: disable=unused-argument
+    """Create the chatbot before the worker takes its first request.
+
+    Arguments:
+        worker -- The Gunicorn worker that has just started
+    """
+    from chatbot import get_bot  # pylint: disable=import-outside-toplevel
+    get_bot()
+
+
+def worker_exit(server, worker) -> None:  # pylint: disable=unused-argument
+    """Push any group messages the chatbot is still holding as the worker stops.
+
+    Arguments:
+        server -- The Gunicorn arbiter
+        worker -- The Gunicorn worker that is exiting
+    """
+    from chatbot import shutdown_bot  # pylint: disable=import-outside-toplevel
+    shutdown_bot()
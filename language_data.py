@@ -16,14 +16,22 @@ Classes:
 
 Functions:
     translate_to -- Translate some text to a given target language
+    translate_to_many -- Translate some text to several target languages at
+        once
 """
 
-import json
+import functools
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
-from typing import Dict, List, TypedDict
+from typing import Dict, Iterable, List, TypedDict
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 
 def _get_timeout() -> int:
@@ -44,6 +52,15 @@ consts.MIRRORS = [
     url + "translate" for url in os.getenv(  # list of mirrors
         "LIBRETRANSLATE").split()]  # type: ignore [union-attr]
 consts.TIMEOUT = _get_timeout()  # seconds before requests time out
+consts.CACHE_SIZE = 4096  # number of translations to remember
+consts.CACHE_TTL = 24 * 60 * 60  # seconds to remember translations
+consts.MAX_TRANSLATIONS = 16  # max requests to LibreTranslate at once
+
+# Reuse keep-alive connections to LibreTranslate rather than paying for a new
+# handshake on every translation
+_session = requests.Session()
+for _prefix in ("https://", "http://"):
+    _session.mount(_prefix, HTTPAdapter(pool_maxsize=consts.MAX_TRANSLATIONS))
 
 # Strings for use in error messages
 err_msgs = SimpleNamespace()
@@ -82,6 +99,11 @@ success.list_ = [
     "language",
     "type"]  # /list column headers
 
+# Strings heading messages relayed from one user to others
+headers = SimpleNamespace()
+headers.says = "says:"  # after the sender's name on group messages
+headers.private_msg = "Private message from"  # before the sender's name on PMs
+
 
 class LangEntry(TypedDict):
     """A TypedDict to describe associated data for some language code.
@@ -119,6 +141,10 @@ class LangEntry(TypedDict):
     lastpost: str  # /lastpost column headers
     list_: str  # /list column headers
 
+    # Message headers
+    says: str  # after the sender's name on group messages
+    private_msg: str  # before the sender's name on private messages
+
 
 class LangData:
     """An object that can hold all language data.
@@ -131,6 +157,8 @@ class LangData:
 
     Instance variables:
         codes -- List of all language codes supported by LibreTranslate
+        codes_set -- Frozen set of the same codes, for checking whether a code
+            is supported
         names -- List of all human-readable language names supported by
             LibreTranslate
         entries -- Dictionary associating language codes with their
@@ -165,6 +193,10 @@ class LangData:
         get_stats_headers -- get the CSV headers for a /stats report
         get_lastpost_headers -- get the CSV headers for a /lastpost report
         get_list_headers -- get the CSV headers for a /list report
+        get_says_many -- get the word following the sender's name on group
+            messages in several languages at once
+        get_private_msg -- get the words preceding the sender's name on private
+            messages
     """
 
     def __init__(self):
@@ -173,22 +205,23 @@ class LangData:
         res = None
         while res is None and idx < len(consts.MIRRORS):
             try:
-                res = requests.get(
+                res = _session.get(
                     f"{consts.MIRRORS[idx]}languages",
                     timeout=consts.TIMEOUT)
             except (TimeoutError, requests.ReadTimeout,
                     requests.ConnectionError, requests.HTTPError):
                 idx = idx + 1
         if res is not None and res.status_code == 200:
-            languages = res.json()
+            languages = orjson.loads(res.content)
         else:
             # If that failed, we can load the data from languages.json
-            with open("languages.json", encoding="utf-8") as file:
-                languages = json.load(file)
+            with open("languages.json", "rb") as file:
+                languages = orjson.loads(file.read())
         self.codes: List[str] = []
         self.names: List[str] = []
         self.entries: Dict[str, LangEntry] = {}
         for lang in languages:
+            lang["code"] = sys.intern(lang["code"])  # compared often
             self.codes.append(lang["code"])
             self.names.append(lang["name"])
             self.entries[lang["code"]] = {
@@ -215,7 +248,10 @@ class LangData:
                 "removed": "",
                 "stats": "",
                 "lastpost": "",
-                "list_": ""}
+                "list_": "",
+                "says": "",
+                "private_msg": ""}
+        self.codes_set = frozenset(self.codes)
         err_msgs.lang_list = "".join(
             ["Languages:"] + list(map(lambda l: (f"\n{l}"), self.names)))
 
@@ -708,13 +744,132 @@ class LangData:
                 return ", ".join(success.list_)
         return self.entries[code]["list_"]
 
+    # Message headers
+
+    def get_says_many(self, codes: Iterable[str]) -> Dict[str, str]:
+        """Get the translated word following a sender's name in many languages.
+
+        Languages it hasn't been translated to yet are translated concurrently,
+        so a group message going out in several of them doesn't wait on each
+        translation in turn.
+
+        Arguments:
+            codes -- Codes of the languages to translate the output to
+
+        Returns:
+            Dictionary mapping each language code to the translated output.
+        """
+        codes = list(codes)
+        missing = [code for code in codes if self.entries[code]["says"] == ""]
+        if len(missing) > 0:
+            try:
+                for code, says in translate_to_many(
+                        headers.says, missing).items():
+                    self.entries[code]["says"] = says
+            except (TimeoutError, requests.ReadTimeout,
+                    requests.ConnectionError, requests.HTTPError):
+                # If we can't translate it at the moment, compromise below and
+                # return it in English
+                pass
+        return {code: self.entries[code]["says"] or headers.says
+                for code in codes}
+
+    def get_private_msg(self, code: str) -> str:
+        """Get the translated words before a sender's name on private messages.
+
+        Arguments:
+            code -- Code of the language to translate the output to
+
+        Returns:
+            The translated output.
+        """
+        if self.entries[code]["private_msg"] == "":
+            try:
+                self.entries[code]["private_msg"] = translate_to(
+                    headers.private_msg, code)
+            except (TimeoutError, requests.ReadTimeout,
+                    requests.ConnectionError, requests.HTTPError):
+                # If we can't translate it at the moment, compromise and return
+                # it in English
+                return headers.private_msg
+        return self.entries[code]["private_msg"]
+
 
 def translate_to(text: str, target_lang: str) -> str:
     """Translate text to the target language using the LibreTranslate API.
 
+    Translations are cached for up to a day, so repeated text (the same message
+    pushed to several subscribers, a common reply, etc.) isn't sent to the API
+    again. The whole cache is cleared once a day, so message text isn't kept in
+    memory any longer than that. Surrounding whitespace is stripped first so it
+    doesn't defeat the cache. Failed translations are not cached.
+
+    Arguments:
+        text -- Text to be translated
+        target_lang -- Target language code ("en", "es", "fr", etc.)
+
+    Returns:
+        Translated text.
+
+    Raises:
+        TimeoutError -- If all mirrors time out before providing a translation
+        requests.ConnectionError -- if all mirrors are down
+        requests.HTTPError -- If a non-OK response is received from the
+            LibreTranslate API
+    """
+    global _cache_period  # pylint: disable=global-statement
+    period = int(time.time() // consts.CACHE_TTL)
+    if period != _cache_period:
+        with _cache_lock:
+            if period != _cache_period:
+                # Entries from earlier periods are never looked up again, so
+                # free them rather than waiting for new ones to push them out
+                _cached_translate.cache_clear()
+                _cache_period = period
+    return _cached_translate(text.strip(), target_lang, period)
+
+
+_cache_period = 0
+"""Number of the cache period the cached translations belong to."""
+_cache_lock = threading.Lock()
+
+
+_translate_pool = ThreadPoolExecutor(max_workers=consts.MAX_TRANSLATIONS)
+
+
+def translate_to_many(text: str, target_langs: Iterable[str]) -> Dict[str, str]:
+    """Translate text to several target languages at once.
+
+    Each language still needs its own request to the LibreTranslate API, but the
+    requests are made concurrently, so this takes about as long as the slowest
+    of them rather than all of them added together.
+
+    Arguments:
+        text -- Text to be translated
+        target_langs -- Target language codes ("en", "es", "fr", etc.)
+
+    Returns:
+        Dictionary mapping each target language code to the translated text.
+
+    Raises:
+        TimeoutError -- If all mirrors time out before providing a translation
+        requests.ConnectionError -- if all mirrors are down
+        requests.HTTPError -- If a non-OK response is received from the
+            LibreTranslate API
+    """
+    langs = list(dict.fromkeys(target_langs))  # drop duplicates, keep order
+    return dict(zip(
+        langs, _translate_pool.map(translate_to, [text] * len(langs), langs)))
+
+
+@functools.lru_cache(maxsize=consts.CACHE_SIZE)
+def _cached_translate(text: str, target_lang: str, _period: int) -> str:
+    """Translate text, caching the result for the current cache period.
+
     Arguments:
         text -- Text to be translated
         target_lang -- Target language code ("en", "es", "fr", etc.)
+        _period -- Number of the cache period the translation belongs to
 
     Returns:
         Translated text.
@@ -730,7 +885,7 @@ def translate_to(text: str, target_lang: str) -> str:
     res = None
     while res is None and idx < len(consts.MIRRORS):
         try:
-            res = requests.post(
+            res = _session.post(
                 consts.MIRRORS[idx],
                 data=payload,
                 timeout=consts.TIMEOUT)
@@ -739,7 +894,7 @@ def translate_to(text: str, target_lang: str) -> str:
     if res is None:  # ran out of mirrors to try
         raise TimeoutError("Translation timed out for all mirrors")
     elif res.status_code == 200:
-        return res.json()["translatedText"]
+        return orjson.loads(res.content)["translatedText"]
     else:
         raise requests.HTTPError(
             f"Translation failed: HTTP {res.status_code} {res.reason}")
@@ -2,9 +2,18 @@
 
 See README.md for more information. Gunicorn could be started by referring to
 this module, e.g., with `gunicorn -b 0.0.0.0:8080 'wsgi:app'`.
+
+The standard library is monkey-patched for gevent before anything else is
+imported, so that the sockets used by requests and the Twilio client yield to
+other requests instead of blocking the worker.
 """
 
-from app import app
+from gevent import monkey
+
+monkey.patch_all()
+
+# pylint: disable=wrong-import-position
+from app import app  # noqa: E402
 
 if __name__ == "__main__":
     app.run()